@@ -0,0 +1,214 @@
+import pandas as pd
+import numpy as np
+import joblib
+import hashlib
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.data.build_dataset import build_historical_dataset
+from src.models.train import prepare_features, build_pipeline
+from src.models.evaluate import score_race
+
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_LOG_LEVEL_VALUE = getattr(logging, _LOG_LEVEL, logging.INFO)
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=_LOG_LEVEL_VALUE, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+FEATURES_PATH = "data/processed/features.csv"
+SNAPSHOT_DIR = "data/backtest/snapshots"
+OUTPUT_PATH = "data/backtest/metrics.csv"
+
+# per-worker state, set once by _init_worker so the features frame is not re-pickled per task
+_features = None
+_race_dates = None
+
+def _init_worker(features: pd.DataFrame):
+    global _features, _race_dates
+    _features = features
+    _race_dates = pd.to_datetime(features["date"], utc=True)
+
+def _snapshot_digest(train_df: pd.DataFrame, pipeline) -> str:
+    """Hash of the training rows and pipeline params, so corrected data or new hyperparameters miss the cache."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(train_df, index=False).to_numpy().tobytes())
+    digest.update(repr(sorted(pipeline.get_params(deep=True).items())).encode())
+    return digest.hexdigest()[:16]
+
+def _load_or_train_snapshot(snapshot_key: str, cutoff, snapshot_dir: str):
+    """Model trained only on races that started before cutoff; cached on disk by snapshot_key."""
+    train_df = _features[_race_dates < cutoff].sort_values("race_id", kind="stable")
+    n_train_races = train_df["race_id"].nunique()
+
+    X_train, y_train = prepare_features(train_df)
+    group_train = train_df.groupby("race_id").size().to_numpy()
+
+    # one thread per model: parallelism comes from the process pool
+    pipeline = build_pipeline(X_train, n_jobs=1)
+
+    path = None
+    if snapshot_dir:
+        path = os.path.join(snapshot_dir, f"{snapshot_key}_{_snapshot_digest(train_df, pipeline)}.pkl")
+        if os.path.exists(path):
+            try:
+                return joblib.load(path), n_train_races
+            except Exception:
+                # truncated write or pickle from other library versions: retrain and overwrite
+                logger.warning(f"Could not load snapshot {path}, retraining", exc_info=True)
+
+    pipeline.fit(X_train, y_train, xgbranker__group=group_train)
+
+    if path:
+        # write then rename so an interrupted run never leaves a partial pickle under the final name
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, path)
+    return pipeline, n_train_races
+
+def _run_snapshot(snapshot_key: str, cutoff, race_ids: list, snapshot_dir: str) -> list:
+    """Predict and score every race served by one model snapshot."""
+    pipeline, n_train_races = _load_or_train_snapshot(snapshot_key, cutoff, snapshot_dir)
+
+    rows = []
+    for race_id in race_ids:
+        race_df = _features[_features["race_id"] == race_id].copy()
+        X_race, _ = prepare_features(race_df)
+
+        race_df["predicted_score"] = pipeline.predict(X_race)
+        race_df["predicted_rank"] = race_df["predicted_score"].rank(method="first", ascending=False)
+
+        metrics = score_race(race_df["finishing_position"], race_df["predicted_rank"], race_df["driver_name"])
+        rows.append({
+            "race_id": race_id,
+            "season": race_df["season"].iloc[0],
+            "race": race_df["race"].iloc[0],
+            "date": race_df["date"].iloc[0],
+            "snapshot": snapshot_key,
+            "n_train_races": n_train_races,
+            **metrics,
+        })
+    return rows
+
+def _plan_snapshots(features: pd.DataFrame, seasons: list, retrain: str, min_train_races: int) -> list:
+    """Group races to backtest by the point-in-time model snapshot that should predict them."""
+    races = features[["race_id", "season", "date"]].drop_duplicates("race_id").copy()
+    races["race_date"] = pd.to_datetime(races["date"], utc=True)
+    races = races.sort_values("race_date").reset_index(drop=True)
+
+    plan = {}
+    for _, race in races.iterrows():
+        if seasons and race["season"] not in seasons:
+            continue
+
+        if retrain == "season":
+            season_start = races.loc[races["season"] == race["season"], "race_date"].min()
+            key, cutoff = f"season_{race['season']}", season_start
+        else:
+            key, cutoff = f"race_{race['race_id']}", race["race_date"]
+
+        if (races["race_date"] < cutoff).sum() < min_train_races:
+            logger.info(f"Skipping {race['race_id']}: fewer than {min_train_races} prior races to train on.")
+            continue
+
+        plan.setdefault(key, (cutoff, []))[1].append(race["race_id"])
+
+    return [(key, cutoff, race_ids) for key, (cutoff, race_ids) in plan.items()]
+
+def run_backtest(seasons: list = None, retrain: str = "race", workers: int = None,
+                 min_train_races: int = 5, snapshot_dir: str = SNAPSHOT_DIR,
+                 output_path: str = OUTPUT_PATH, rebuild: bool = False, since: int = 2023):
+    """Replay historical races with point-in-time models and score each prediction.
+
+    Returns the per-race metrics frame and the keys of any snapshots that failed.
+    Raises RuntimeError if there are no features to backtest or every snapshot failed.
+    """
+    start = time.monotonic()
+
+    # reuse the cached feature set; only hit OpenF1 when asked or when nothing is cached yet
+    # (the checked-in features.csv is header-only, so no rows counts as nothing cached)
+    features = pd.read_csv(FEATURES_PATH) if os.path.exists(FEATURES_PATH) else None
+    if rebuild or features is None or features.empty:
+        logger.info(f"Building features from OpenF1 since {since}...")
+        if build_historical_dataset(limit_year=since).empty:
+            raise RuntimeError(f"OpenF1 returned no races since {since}; nothing to backtest.")
+        features = pd.read_csv(FEATURES_PATH)
+
+    missing = sorted(set(seasons or []) - set(features["season"].unique()))
+    if missing:
+        logger.warning(f"Seasons {missing} are not in {FEATURES_PATH}; rebuild with --rebuild --since <year> to include them.")
+
+    if snapshot_dir:
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    plan = _plan_snapshots(features, seasons, retrain, min_train_races)
+    logger.info(f"Backtesting {sum(len(r) for _, _, r in plan)} races with {len(plan)} model snapshots")
+
+    rows = []
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as pool:
+        futures = {
+            pool.submit(_run_snapshot, key, cutoff, race_ids, snapshot_dir): key
+            for key, cutoff, race_ids in plan
+        }
+        for future in as_completed(futures):
+            try:
+                rows.extend(future.result())
+            except Exception:
+                logger.exception(f"Backtest snapshot {futures[future]} failed")
+                failed.append(futures[future])
+
+    if plan and len(failed) == len(plan):
+        raise RuntimeError(f"All {len(plan)} backtest snapshots failed; see the log for tracebacks.")
+
+    metrics = pd.DataFrame(rows)
+    if metrics.empty:
+        logger.error("No races were backtested; check --seasons and --min-train-races against the cached features.")
+        return metrics, failed
+
+    metrics = metrics.sort_values("date").reset_index(drop=True)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    metrics.to_csv(output_path, index=False)
+
+    logger.info(f"Backtest finished in {time.monotonic() - start:.1f}s, saved to {output_path}")
+    logger.info(f"  Avg NDCG@10: {metrics['ndcg@10'].mean():.4f}")
+    logger.info(f"  Avg Kendall Tau: {metrics['kendall_tau'].mean():.4f}")
+    logger.info(f"  Avg Spearman: {metrics['spearman'].mean():.4f}")
+    logger.info(f"  Winner accuracy: {metrics['winner_correct'].sum()}/{len(metrics)} = {np.mean(metrics['winner_correct']):.2%}")
+    if failed:
+        logger.error(f"{len(failed)}/{len(plan)} snapshots failed, their races are missing from the metrics: {', '.join(sorted(failed))}")
+
+    return metrics, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the race predictor over past seasons.")
+    parser.add_argument("--seasons", type=int, nargs="*", help="Seasons to replay (default: all cached seasons)")
+    parser.add_argument("--retrain", choices=["race", "season"], default="race",
+                        help="Train a snapshot before every race, or once before each season")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--min-train-races", type=int, default=5,
+                        help="Skip races with fewer prior races than this to train on")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR,
+                        help="Where model snapshots are cached; pass an empty string to disable")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Per-race metrics CSV")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild features from OpenF1 before backtesting")
+    parser.add_argument("--since", type=int, default=2023,
+                        help="First season to fetch when features are (re)built from OpenF1")
+    args = parser.parse_args(argv)
+
+    metrics, failed = run_backtest(
+        seasons=args.seasons,
+        retrain=args.retrain,
+        workers=args.workers,
+        min_train_races=args.min_train_races,
+        snapshot_dir=args.snapshot_dir,
+        output_path=args.output,
+        rebuild=args.rebuild,
+        since=args.since,
+    )
+    return 1 if failed or metrics.empty else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
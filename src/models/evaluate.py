@@ -11,6 +11,32 @@ if not logging.getLogger().handlers:
     logging.basicConfig(level=_LOG_LEVEL_VALUE, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+def score_race(positions: pd.Series, predicted_ranks: pd.Series, driver_names: pd.Series) -> dict:
+    """Ranking metrics for one race given actual positions and predicted ranks."""
+    true_scores = 21 - positions.to_numpy()
+    pred_scores = 21 - predicted_ranks.to_numpy()
+
+    # ranking metrics are undefined for a single driver (ndcg_score raises)
+    if len(true_scores) < 2:
+        ndcg = tau = rho = float("nan")
+    else:
+        ndcg = ndcg_score([true_scores], [pred_scores], k=10)
+        tau, _ = kendalltau(true_scores, pred_scores)
+        rho, _ = spearmanr(true_scores, pred_scores)
+
+    actual_winner = driver_names.loc[positions.idxmin()]
+    predicted_winner = driver_names.loc[predicted_ranks.idxmin()]
+    winner_correct = actual_winner == predicted_winner
+
+    return {
+        "ndcg@10": ndcg,
+        "kendall_tau": tau,
+        "spearman": rho,
+        "winner_correct": winner_correct,
+        "actual_winner": actual_winner,
+        "predicted_winner": predicted_winner
+    }
+
 def evaluate_model():
     # Step 1: Fetch latest race results
     latest_result = fetch_latest_session_results()
@@ -25,29 +51,13 @@ def evaluate_model():
 
     merged = predictions_log.merge(df_results, on="driver_number")
 
-    true_scores = 21 - merged["position"].to_numpy()
-    pred_scores = 21 - merged["predicted_rank"].to_numpy()
+    metrics = score_race(merged["position"], merged["predicted_rank"], merged["driver_name"])
 
-    ndcg = ndcg_score([true_scores], [pred_scores], k=10)
-    tau, _ = kendalltau(true_scores, pred_scores)
-    rho, _ = spearmanr(true_scores, pred_scores)
-
-    actual_winner = merged.loc[merged["position"].idxmin(), "driver_name"]
-    predicted_winner = merged.loc[merged["predicted_rank"].idxmin(), "driver_name"]
-    winner_correct = actual_winner == predicted_winner
-    
     logger.info(f"Evaluation for race:")
-    logger.info(f"  NDCG@10: {ndcg:.4f}")
-    logger.info(f"  Kendall Tau: {tau:.4f}")
-    logger.info(f"  Spearman: {rho:.4f}")
-    logger.info(f"  Winner predicted correctly? {winner_correct} "
-          f"(Pred={predicted_winner}, Actual={actual_winner})")
+    logger.info(f"  NDCG@10: {metrics['ndcg@10']:.4f}")
+    logger.info(f"  Kendall Tau: {metrics['kendall_tau']:.4f}")
+    logger.info(f"  Spearman: {metrics['spearman']:.4f}")
+    logger.info(f"  Winner predicted correctly? {metrics['winner_correct']} "
+          f"(Pred={metrics['predicted_winner']}, Actual={metrics['actual_winner']})")
 
-    return {
-        "ndcg@10": ndcg,
-        "kendall_tau": tau,
-        "spearman": rho,
-        "winner_correct": winner_correct,
-        "actual_winner": actual_winner,
-        "predicted_winner": predicted_winner
-    }
\ No newline at end of file
+    return metrics
\ No newline at end of file
@@ -16,42 +16,31 @@ if not logging.getLogger().handlers:
     logging.basicConfig(level=_LOG_LEVEL_VALUE, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
-def train_model():
-    # Load data
-    df = pd.read_csv("data/processed/features.csv")
+CATEGORICAL_FEATURES = ["circuit", "constructor", "dominant_wind_dir", "race"]
 
+def prepare_features(df: pd.DataFrame):
+    """Split a features frame into model inputs X and relevance target y."""
     # Define target
     y = 21 - df["finishing_position"]
 
-    # Features we keep
-    X = df.drop(columns=["finishing_position", "driver_name"])  
-
-    # Categorical and numeric splits
-    categorical_features = ["circuit", "constructor", "dominant_wind_dir", "race"]
-    numeric_features = [col for col in X.columns if col not in categorical_features and col != "date"]
+    # Features we keep (race_id is a per-race identifier, not a feature)
+    X = df.drop(columns=["finishing_position", "driver_name", "race_id"])
 
     # Extract season/year/month from date
     X["year"] = pd.to_datetime(df["date"]).dt.year
     X["month"] = pd.to_datetime(df["date"]).dt.month
     X = X.drop(columns=["date"])
 
-    race_ids = df["race_id"].unique()
-    train_ids, test_ids = train_test_split(race_ids, test_size=0.2, random_state=42)
+    return X, y
 
-    train_mask = df["race_id"].isin(train_ids)
-    test_mask = df["race_id"].isin(test_ids)
-
-    X_train, y_train = X[train_mask], y[train_mask]
-    X_test, y_test = X[test_mask], y[test_mask]
-
-    # Groups (counts of drivers per race) for train/test
-    group_train = df[train_mask].groupby("race_id").size().to_numpy()
-    group_test = df[test_mask].groupby("race_id").size().to_numpy()
+def build_pipeline(X: pd.DataFrame, n_jobs: int = None):
+    """Preprocessing + XGBoost ranker pipeline for the columns in X."""
+    numeric_features = [col for col in X.columns if col not in CATEGORICAL_FEATURES and col not in ("year", "month")]
 
     # Preprocessing
     preprocessor = ColumnTransformer(
         transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
             ("num", "passthrough", numeric_features + ["year", "month"])
         ]
     )
@@ -63,10 +52,32 @@ def train_model():
         max_depth=6,
         n_estimators=200,
         random_state=42,
+        n_jobs=n_jobs,
     )
 
     # Full pipeline
-    pipeline = make_pipeline(preprocessor, ranker)
+    return make_pipeline(preprocessor, ranker)
+
+def train_model():
+    # Load data
+    df = pd.read_csv("data/processed/features.csv")
+
+    X, y = prepare_features(df)
+
+    race_ids = df["race_id"].unique()
+    train_ids, test_ids = train_test_split(race_ids, test_size=0.2, random_state=42)
+
+    train_mask = df["race_id"].isin(train_ids)
+    test_mask = df["race_id"].isin(test_ids)
+
+    X_train, y_train = X[train_mask], y[train_mask]
+    X_test, y_test = X[test_mask], y[test_mask]
+
+    # Groups (counts of drivers per race) for train/test
+    group_train = df[train_mask].groupby("race_id").size().to_numpy()
+    group_test = df[test_mask].groupby("race_id").size().to_numpy()
+
+    pipeline = build_pipeline(X)
 
     # Fit model (must include group info)
     pipeline.fit(X_train, y_train, xgbranker__group=group_train)
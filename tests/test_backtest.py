@@ -0,0 +1,195 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.models.backtest as backtest
+from src.models.backtest import _plan_snapshots, main, run_backtest
+
+
+def _features():
+    rows = []
+    for season, month_offset in ((2023, 0), (2024, 12)):
+        for i in range(4):
+            date = pd.Timestamp(2023, 3, 1, tz="UTC") + pd.DateOffset(months=month_offset + i)
+            for driver in (1, 2):
+                rows.append({"race_id": f"{season}_{i}", "season": season, "date": date.isoformat()})
+    # shuffle so planning can't rely on file order
+    return pd.DataFrame(rows).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def _race_dates(features):
+    races = features.drop_duplicates("race_id")
+    return dict(zip(races["race_id"], pd.to_datetime(races["date"], utc=True)))
+
+
+@pytest.mark.parametrize("retrain", ["race", "season"])
+def test_plan_never_trains_on_the_predicted_race_or_later(retrain):
+    features = _features()
+    dates = _race_dates(features)
+
+    plan = _plan_snapshots(features, seasons=None, retrain=retrain, min_train_races=1)
+
+    assert plan
+    for _, cutoff, race_ids in plan:
+        train_ids = {r for r, d in dates.items() if d < cutoff}
+        for race_id in race_ids:
+            assert cutoff <= dates[race_id]
+            assert race_id not in train_ids
+            assert all(dates[r] < dates[race_id] for r in train_ids)
+
+
+def test_plan_race_mode_one_snapshot_per_race():
+    plan = _plan_snapshots(_features(), seasons=None, retrain="race", min_train_races=1)
+
+    # the very first race has nothing before it
+    assert sorted(r for _, _, race_ids in plan for r in race_ids) == \
+        ["2023_1", "2023_2", "2023_3", "2024_0", "2024_1", "2024_2", "2024_3"]
+    assert all(len(race_ids) == 1 for _, _, race_ids in plan)
+
+
+def test_plan_season_mode_cuts_off_at_season_start():
+    features = _features()
+    dates = _race_dates(features)
+
+    plan = _plan_snapshots(features, seasons=None, retrain="season", min_train_races=1)
+
+    # 2023 has no earlier season to train on
+    assert len(plan) == 1
+    key, cutoff, race_ids = plan[0]
+    assert key == "season_2024"
+    assert cutoff == dates["2024_0"]
+    assert sorted(race_ids) == ["2024_0", "2024_1", "2024_2", "2024_3"]
+
+
+def test_plan_skips_races_below_min_train_races():
+    plan = _plan_snapshots(_features(), seasons=[2023], retrain="race", min_train_races=2)
+
+    assert [race_ids for _, _, race_ids in plan] == [["2023_2"], ["2023_3"]]
+
+
+def _full_features():
+    """Small synthetic features.csv: two seasons of four races, six drivers each."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for season in (2023, 2024):
+        for i, circuit in enumerate(["Sakhir", "Jeddah", "Monaco", "Monza"]):
+            date = pd.Timestamp(season, 3, 1, tz="UTC") + pd.DateOffset(months=i)
+            grid = rng.permutation(6) + 1
+            for driver in range(6):
+                rows.append({
+                    "race_id": f"{season}_{i}", "season": season, "race": f"{circuit} GP",
+                    "circuit": circuit, "date": date.isoformat(),
+                    "driver_number": driver + 1, "driver_name": f"Driver {driver + 1}",
+                    "constructor": f"Team {driver % 3}",
+                    "starting_position": grid[driver], "finishing_position": grid[driver],
+                    "avg_track_temp": 30.0, "max_track_temp": 35.0, "min_track_temp": 25.0,
+                    "avg_air_temp": 22.0, "avg_humidity": 50.0, "avg_pressure": 1010.0,
+                    "rain_occurrence": 0, "avg_wind_speed": 2.0, "dominant_wind_dir": 90,
+                })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run from tmp_path with a cached features.csv so nothing touches OpenF1."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.dirname(backtest.FEATURES_PATH))
+    _full_features().to_csv(backtest.FEATURES_PATH, index=False)
+    return tmp_path
+
+
+def _run(workdir, **kwargs):
+    return run_backtest(
+        workers=1, min_train_races=2,
+        snapshot_dir=str(workdir / "snapshots"), output_path=str(workdir / "metrics.csv"),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("retrain", ["race", "season"])
+def test_run_backtest_scores_every_planned_race_point_in_time(workdir, retrain):
+    features = pd.read_csv(backtest.FEATURES_PATH)
+    dates = _race_dates(features)
+    plan = _plan_snapshots(features, seasons=None, retrain=retrain, min_train_races=2)
+
+    metrics, failed = _run(workdir, retrain=retrain)
+
+    assert failed == []
+    written = pd.read_csv(workdir / "metrics.csv")
+    assert sorted(written["race_id"]) == sorted(r for _, _, race_ids in plan for r in race_ids)
+    cutoffs = {race_id: cutoff for _, cutoff, race_ids in plan for race_id in race_ids}
+    for _, row in written.iterrows():
+        assert row["n_train_races"] == sum(d < cutoffs[row["race_id"]] for d in dates.values())
+        assert cutoffs[row["race_id"]] <= dates[row["race_id"]]
+
+
+def test_run_backtest_reuses_cached_snapshots(workdir):
+    _run(workdir)
+    snapshots = sorted((workdir / "snapshots").iterdir())
+    mtimes = [p.stat().st_mtime_ns for p in snapshots]
+
+    _run(workdir)
+
+    assert sorted((workdir / "snapshots").iterdir()) == snapshots
+    assert [p.stat().st_mtime_ns for p in snapshots] == mtimes
+
+
+def test_run_backtest_retrains_unreadable_snapshot(workdir):
+    _run(workdir)
+    snapshot = sorted((workdir / "snapshots").iterdir())[0]
+    snapshot.write_bytes(snapshot.read_bytes()[:100])
+
+    _, failed = _run(workdir)
+
+    assert failed == []
+    joblib.load(snapshot)
+
+
+def test_run_backtest_rebuilds_header_only_features(workdir, monkeypatch):
+    pd.DataFrame(columns=_full_features().columns).to_csv(backtest.FEATURES_PATH, index=False)
+
+    def fake_build(limit_year):
+        df = _full_features()
+        df.to_csv(backtest.FEATURES_PATH, index=False)
+        return df
+
+    monkeypatch.setattr(backtest, "build_historical_dataset", fake_build)
+
+    metrics, failed = _run(workdir)
+
+    assert not metrics.empty
+    assert failed == []
+
+
+def test_run_backtest_raises_when_rebuild_finds_no_races(workdir, monkeypatch):
+    monkeypatch.setattr(backtest, "build_historical_dataset", lambda limit_year: pd.DataFrame())
+
+    with pytest.raises(RuntimeError):
+        _run(workdir, rebuild=True)
+
+
+def _main(workdir, *args):
+    return main(["--workers", "1", "--snapshot-dir", str(workdir / "snapshots"),
+                 "--output", str(workdir / "metrics.csv"), *args])
+
+
+def test_main_exits_zero_on_success(workdir):
+    assert _main(workdir, "--min-train-races", "2") == 0
+
+
+def test_main_exits_nonzero_when_a_snapshot_fails(workdir):
+    features = _full_features()
+    # a non-numeric value in the last race breaks only that race's prediction
+    features["starting_position"] = features["starting_position"].astype(object)
+    features.loc[features["race_id"] == "2024_3", "starting_position"] = "P1"
+    features.to_csv(backtest.FEATURES_PATH, index=False)
+
+    assert _main(workdir, "--min-train-races", "2") == 1
+    assert "2024_3" not in set(pd.read_csv(workdir / "metrics.csv")["race_id"])
+
+
+def test_main_exits_nonzero_when_no_races_scored(workdir):
+    assert _main(workdir, "--min-train-races", "100") == 1
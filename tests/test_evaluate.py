@@ -0,0 +1,45 @@
+import math
+
+import pandas as pd
+from scipy.stats import kendalltau, spearmanr
+from sklearn.metrics import ndcg_score
+
+from src.models.evaluate import score_race
+
+
+def _race():
+    return pd.DataFrame({
+        "driver_name": ["Verstappen", "Norris", "Leclerc", "Piastri", "Hamilton"],
+        "position": [2, 1, 3, 21, 4],
+        "predicted_rank": [1, 2, 4, 3, 5],
+    })
+
+
+def test_score_race_matches_previous_inline_metrics():
+    merged = _race()
+
+    # the computation evaluate_model used to do inline
+    true_scores = 21 - merged["position"].to_numpy()
+    pred_scores = 21 - merged["predicted_rank"].to_numpy()
+    expected_tau, _ = kendalltau(true_scores, pred_scores)
+    expected_rho, _ = spearmanr(true_scores, pred_scores)
+
+    metrics = score_race(merged["position"], merged["predicted_rank"], merged["driver_name"])
+
+    assert metrics["ndcg@10"] == ndcg_score([true_scores], [pred_scores], k=10)
+    assert metrics["kendall_tau"] == expected_tau
+    assert metrics["spearman"] == expected_rho
+    assert metrics["actual_winner"] == "Norris"
+    assert metrics["predicted_winner"] == "Verstappen"
+    assert not metrics["winner_correct"]
+
+
+def test_score_race_single_driver():
+    merged = _race().iloc[[1]]
+
+    metrics = score_race(merged["position"], merged["predicted_rank"], merged["driver_name"])
+
+    assert math.isnan(metrics["ndcg@10"])
+    assert math.isnan(metrics["kendall_tau"])
+    assert math.isnan(metrics["spearman"])
+    assert metrics["winner_correct"]
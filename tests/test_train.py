@@ -0,0 +1,22 @@
+from src.models.train import build_pipeline, prepare_features
+from tests.test_backtest import _full_features
+
+
+def test_prepare_features_drops_identifiers_and_target():
+    df = _full_features()
+
+    X, y = prepare_features(df)
+
+    assert not {"race_id", "driver_name", "finishing_position", "date"} & set(X.columns)
+    assert (y == 21 - df["finishing_position"]).all()
+
+
+def test_pipeline_does_not_consume_race_id():
+    df = _full_features().sort_values("race_id", kind="stable")
+    X, y = prepare_features(df)
+
+    pipeline = build_pipeline(X)
+    pipeline.fit(X, y, xgbranker__group=df.groupby("race_id").size().to_numpy())
+
+    # "2023_1229" parses as the float 20231229, so a leaked race_id would fit silently
+    assert not any("race_id" in name for name in pipeline[0].get_feature_names_out())